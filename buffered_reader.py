@@ -0,0 +1,150 @@
+import codecs
+import io
+import queue
+import threading
+import time
+from typing import Callable, Iterator, List, Optional, Text, Union
+
+__all__ = [
+    'ReadAheadReader',
+    'ThrottledOpener'
+]
+
+_END_OF_FILE = object()
+
+
+class ThrottledOpener:
+    """
+    ThrottledOpener opens files in binary mode and sleeps `latency` seconds
+    before every read. It simulates a slow network or FUSE mount (eg: Google
+    Drive on Colab) for local testing of ReadAheadReader.
+    """
+
+    def __init__(self, latency: float = 0.05):
+        self.latency = latency
+
+    def __call__(self, path: Text):
+        return _ThrottledFile(open(path, "rb", buffering=0), self.latency)
+
+
+class _ThrottledFile:
+    def __init__(self, raw, latency: float):
+        self.raw = raw
+        self.latency = latency
+
+    def read(self, size: int = -1) -> bytes:
+        time.sleep(self.latency)
+        return self.raw.read(size)
+
+    def close(self):
+        self.raw.close()
+
+
+class ReadAheadReader:
+    """
+    ReadAheadReader reads a file in large blocks on a background thread and
+    keeps up to `read_ahead` blocks queued, so that the latency of a slow
+    mount overlaps with tokenization. Blocks are decoded from UTF-8 in bulk
+    and handed out as batches of complete lines, with newlines translated
+    the same way as `open()` in text mode. With `decode=False` the lines are
+    handed out as undecoded `bytes`.
+
+    Usage:
+        with ReadAheadReader(path) as reader:
+            for lines in reader:
+                ...
+    """
+
+    def __init__(self, path: Text, block_size: int = 1024 * 1024, read_ahead: int = 4,
+                 opener: Optional[Callable] = None, decode: bool = True):
+        if block_size <= 0:
+            raise ValueError("block_size must be positive.")
+        if read_ahead <= 0:
+            raise ValueError("read_ahead must be positive.")
+        self.path = path
+        self.block_size = block_size
+        self.decode = decode
+        self.opener = opener or (lambda p: open(p, "rb", buffering=0))
+        self._blocks = queue.Queue(maxsize=read_ahead)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._read_blocks, daemon=True)
+        self._thread.start()
+
+    def _put(self, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._blocks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _read_blocks(self):
+        try:
+            source = self.opener(self.path)
+            try:
+                while not self._stop.is_set():
+                    block = source.read(self.block_size)
+                    if not block:
+                        break
+                    if not self._put(block):
+                        return
+            finally:
+                source.close()
+        except BaseException as error:
+            self._put(error)
+            return
+        self._put(_END_OF_FILE)
+
+    def __iter__(self) -> Iterator[Union[List[Text], List[bytes]]]:
+        if not self.decode:
+            yield from self._iter_bytes()
+            return
+        decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder("utf-8")(), translate=True)
+        remainder = ""
+        while True:
+            block = self._blocks.get()
+            if block is _END_OF_FILE:
+                break
+            if isinstance(block, BaseException):
+                raise block
+            parts = (remainder + decoder.decode(block)).split("\n")
+            remainder = parts.pop()
+            if parts:
+                yield [part + "\n" for part in parts]
+        remainder += decoder.decode(b"", final=True)
+        if remainder:
+            yield [remainder]
+
+    def _iter_bytes(self) -> Iterator[List[bytes]]:
+        remainder = b""
+        pending_cr = b""
+        while True:
+            block = self._blocks.get()
+            if block is _END_OF_FILE:
+                break
+            if isinstance(block, BaseException):
+                raise block
+            block = pending_cr + block
+            # a '\r' at the end of a block may be the first half of a '\r\n'
+            pending_cr = b"\r" if block.endswith(b"\r") else b""
+            if pending_cr:
+                block = block[:-1]
+            parts = (remainder + block.replace(b"\r\n", b"\n").replace(b"\r", b"\n")).split(b"\n")
+            remainder = parts.pop()
+            if parts:
+                yield [part + b"\n" for part in parts]
+        if pending_cr:
+            remainder += b"\n"
+        if remainder:
+            yield [remainder]
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
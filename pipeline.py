@@ -1,19 +1,33 @@
-from typing import List, Text
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Text, Tuple, Union
+from buffered_reader import ReadAheadReader, ThrottledOpener
 from tokenizer import SinhalaTokenizer
+import argparse
 import codecs
+import hashlib
+import math
 import os
 import glob
 
 tokenizer = SinhalaTokenizer()
 
+# hashed shards are sized to hold this fraction of the cap on average, the
+# headroom keeps most shards under the cap so few of them need a second part
+SHARD_FILL_RATIO = 0.8
 
-def tokenize_line(line: Text) -> List[Text]:
+
+def tokenize_line(line: Union[Text, bytes]) -> List[Text]:
     """
     tokenize_line takes a line as the input, iterates over the sentences 
     within the line, tokenize the sentences and returns the tokenized
     sentences as a list.  
+    An UTF-8 encoded `bytes` line is split into sentences with the bytes
+    fast path of the sentence splitter.
     """
-    sentences = tokenizer.split_sentences(line)
+    if isinstance(line, bytes):
+        sentences = tokenizer.split_sentences_bytes(line)
+    else:
+        sentences = tokenizer.split_sentences(line)
     tokenized_sentences = []
     for sentence in sentences:
         tokens = tokenizer.tokenize(sentence)
@@ -22,21 +36,28 @@ def tokenize_line(line: Text) -> List[Text]:
     return tokenized_sentences
 
 
-def tokenize_directory(directory="datasets/raw"):
+def tokenize_directory(directory="datasets/raw", block_size: int = 1024 * 1024, read_ahead: int = 4,
+                       opener: Optional[Callable] = None, bytes_fast_path: bool = False):
     """
     tokenize_directory is the start of the pipeline. It will take an
     input directory with text files, tokenize every sentence and save
     the tokenized sentences in a temporary text file. 
+    Source files are read through a ReadAheadReader, which fetches
+    `block_size` byte blocks up to `read_ahead` blocks ahead on a
+    background thread so that reads from a slow mount overlap with
+    tokenization. With `bytes_fast_path` the lines are split into sentences
+    as UTF-8 bytes and only the resulting sentences are decoded.
     """
     initialize_directory_structure()
     temp_file = codecs.open("datasets/temp/temp.txt", "w+", "utf-8")
     for source_file in glob.glob(os.path.join(directory, '*.txt')):
-        with open(source_file) as file:
-            for line in file:
-                tokenized_sentences = tokenize_line(line)
-                for tokenized_sentence in tokenized_sentences:
-                    if len(tokenized_sentence) > 20:
-                        temp_file.write(tokenized_sentence)
+        with ReadAheadReader(source_file, block_size, read_ahead, opener, decode=not bytes_fast_path) as reader:
+            for lines in reader:
+                for line in lines:
+                    tokenized_sentences = tokenize_line(line)
+                    for tokenized_sentence in tokenized_sentences:
+                        if len(tokenized_sentence) > 20:
+                            temp_file.write(tokenized_sentence)
     temp_file.close()
 
 
@@ -46,6 +67,7 @@ def write_to_shards():
     write those sentences into small text files specified by a limit.
     """
     lines_per_file = int(100000)
+    remove_shards("datasets/tokenized")
     smallfile = None
     dedup_set = set()
     with open("datasets/temp/temp.txt") as tempfile:
@@ -63,6 +85,162 @@ def write_to_shards():
             smallfile.close()
 
 
+def stable_hash(line: Text) -> Tuple[int, float]:
+    """
+    stable_hash digests a sentence with blake2b and returns an integer key
+    used to assign the sentence to a shard and a number in [0, 1) used to
+    pick its split. Unlike `hash()`, the result is the same on every run.
+    """
+    digest = hashlib.blake2b(line.encode("utf-8"), digest_size=16).digest()
+    shard_key = int.from_bytes(digest[:8], "big")
+    split_point = int.from_bytes(digest[8:], "big") / 2 ** 64
+    return shard_key, split_point
+
+
+def pick_split(split_point: float, splits: Dict[Text, float]) -> Text:
+    """
+    Helper method to map a split point in [0, 1) to a split name using the
+    cumulative split ratios.
+    """
+    total = sum(splits.values())
+    cumulative = 0.0
+    name = ""
+    for name, ratio in splits.items():
+        cumulative += ratio / total
+        if split_point < cumulative:
+            return name
+    return name
+
+
+def partition_shards(lines: List[Tuple[int, Text]], max_bytes: Optional[int] = None,
+                     max_lines: Optional[int] = None) -> List[List[List[Text]]]:
+    """
+    partition_shards assigns every (hash, sentence) pair to one of `n`
+    shards by `hash % n`, where `n` is the shard count that fills shards to
+    SHARD_FILL_RATIO of `max_bytes` (UTF-8 encoded) and `max_lines` on
+    average. Adding or removing sentences only changes their own shards
+    while `n` stays the same. `n` changes whenever the total crosses a
+    multiple of the filled cap, and then nearly every sentence moves.
+    The rare shard that still goes over a cap is split into consecutive
+    parts ordered by hash, the overflow part being small. A single sentence
+    larger than `max_bytes` still gets a part of its own. Returns a list of
+    parts for every shard.
+    """
+    sized_lines = [(shard_key, line, len(line.encode("utf-8"))) for shard_key, line in lines]
+    shard_count = 1
+    if max_bytes is not None:
+        total_bytes = sum(size for _, _, size in sized_lines)
+        shard_count = max(shard_count, math.ceil(total_bytes / (max_bytes * SHARD_FILL_RATIO)))
+    if max_lines is not None:
+        shard_count = max(shard_count, math.ceil(len(sized_lines) / (max_lines * SHARD_FILL_RATIO)))
+
+    buckets = [[] for _ in range(shard_count)]
+    for sized_line in sorted(sized_lines):
+        buckets[sized_line[0] % shard_count].append(sized_line)
+
+    shards = []
+    for bucket in buckets:
+        parts = []
+        part = []
+        part_bytes = 0
+        for _, line, line_bytes in bucket:
+            if part and ((max_bytes is not None and part_bytes + line_bytes > max_bytes) or
+                         (max_lines is not None and len(part) >= max_lines)):
+                parts.append(part)
+                part = []
+                part_bytes = 0
+            part.append(line)
+            part_bytes += line_bytes
+        if part:
+            parts.append(part)
+        shards.append(parts)
+    return shards
+
+
+def remove_shards(directory: Text):
+    """
+    Helper method to remove the shards of a previous run from `directory`
+    and its split sub directories, so that stale shards are not mixed with
+    the new ones. Split sub directories left empty are removed as well.
+    """
+    for pattern in ["tokenized_shard_*.txt", os.path.join("*", "tokenized_shard_*.txt")]:
+        for shard_file in glob.glob(os.path.join(directory, pattern)):
+            os.remove(shard_file)
+    for sub_directory in glob.glob(os.path.join(directory, "*", "")):
+        if not os.listdir(sub_directory):
+            os.rmdir(sub_directory)
+
+
+def write_shard(filename: Text, lines: List[Text]):
+    """
+    Helper method to write a single shard to disk.
+    """
+    with codecs.open(filename, "w", "utf-8") as shard_file:
+        shard_file.writelines(lines)
+
+
+def write_to_hashed_shards(max_bytes: Optional[int] = 64 * 1024 * 1024, max_lines: Optional[int] = None,
+                           splits: Optional[Dict[Text, float]] = None, workers: int = 4):
+    """
+    write_to_hashed_shards is a deterministic alternative to write_to_shards.
+    Every unique sentence in the tempfile is placed by a stable hash, so the
+    same input always produces byte-identical shards. Shards are capped by
+    `max_bytes` and/or `max_lines` and written in parallel by `workers`
+    threads. When `splits` is given (eg: {"train": 0.98, "validation": 0.01,
+    "test": 0.01}) every sentence is also assigned to a split by its hash
+    and each split is sharded into its own sub directory. Shards of earlier
+    runs are removed first. Shard files are named
+    `tokenized_shard_<shard>_<part>.txt`, see partition_shards.
+    """
+    if max_bytes is None and max_lines is None:
+        raise ValueError("At least one of max_bytes or max_lines must be set.")
+    if max_bytes is not None and max_bytes <= 0:
+        raise ValueError("max_bytes must be positive.")
+    if max_lines is not None and max_lines <= 0:
+        raise ValueError("max_lines must be positive.")
+    if workers < 1:
+        raise ValueError("workers must be at least 1.")
+    dedup_set = set()
+    # split on '\n' only, `codecs.open` would split on every unicode line
+    # boundary (Eg: '\x85') left inside sentences
+    with open("datasets/temp/temp.txt", encoding="utf-8", newline="\n") as tempfile:
+        for line in tempfile:
+            dedup_set.add(line)
+
+    split_lines = {}
+    for line in dedup_set:
+        shard_key, split_point = stable_hash(line)
+        split = pick_split(split_point, splits) if splits else ""
+        split_lines.setdefault(split, []).append((shard_key, line))
+
+    remove_shards("datasets/tokenized")
+    jobs = []
+    for split, lines in split_lines.items():
+        output_directory = os.path.join("datasets/tokenized", split)
+        if not os.path.exists(output_directory):
+            os.makedirs(output_directory)
+        for index, parts in enumerate(partition_shards(lines, max_bytes, max_lines)):
+            for part_index, part in enumerate(parts):
+                small_filename = os.path.join(output_directory,
+                                              'tokenized_shard_{:05d}_{:03d}.txt'.format(index, part_index))
+                jobs.append((small_filename, part))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for future in [executor.submit(write_shard, filename, shard) for filename, shard in jobs]:
+            future.result()
+
+
+def parse_splits(value: Text) -> Dict[Text, float]:
+    """
+    Helper method to parse a `train,validation,test` ratio string such as
+    `0.98,0.01,0.01` for the --splits argument.
+    """
+    ratios = [float(ratio) for ratio in value.split(",")]
+    if len(ratios) != 3 or min(ratios) < 0 or sum(ratios) <= 0:
+        raise argparse.ArgumentTypeError("splits must be three non negative ratios, eg: 0.98,0.01,0.01")
+    return dict(zip(["train", "validation", "test"], ratios))
+
+
 def initialize_directory_structure():
     """
     Helper method to initiate directory structure.
@@ -73,6 +251,60 @@ def initialize_directory_structure():
         os.makedirs("datasets/tokenized")
 
 
-# Pipeline steps
-tokenize_directory()
-write_to_shards()
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sharding", choices=["legacy", "hash"], default="legacy",
+                        help="legacy writes 100000 lines per shard in arbitrary order, "
+                             "hash writes deterministic hash partitioned shards")
+    parser.add_argument("--max-shard-bytes", type=int, default=None,
+                        help="Maximum size of a shard in bytes (hash sharding only), "
+                             "defaults to 64MiB when --max-shard-lines is not set. The shard count is "
+                             "derived from the corpus size, so sentences keep their shard only while "
+                             "the corpus stays within the same multiple of the cap")
+    parser.add_argument("--max-shard-lines", type=int, default=None,
+                        help="Maximum number of lines in a shard (hash sharding only), with the same "
+                             "shard count caveat as --max-shard-bytes")
+    parser.add_argument("--splits", type=parse_splits, default=None,
+                        help="train,validation,test ratios, eg: 0.98,0.01,0.01 (hash sharding only)")
+    parser.add_argument("--block-size", type=int, default=1024 * 1024,
+                        help="Size in bytes of each block read from the raw files")
+    parser.add_argument("--read-ahead", type=int, default=4,
+                        help="Number of blocks to read ahead of the tokenizer")
+    parser.add_argument("--bytes-fast-path", action="store_true",
+                        help="Split sentences on the raw UTF-8 bytes and decode only the kept sentences")
+    parser.add_argument("--simulate-latency-ms", type=int, default=0,
+                        help="Sleep before every block read to simulate a slow mount (for testing)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Number of parallel shard writers (hash sharding only), defaults to 4")
+    args = parser.parse_args()
+
+    hash_only_args = {"--max-shard-bytes": args.max_shard_bytes, "--max-shard-lines": args.max_shard_lines,
+                      "--splits": args.splits, "--workers": args.workers}
+    if args.sharding != "hash":
+        given = [name for name, value in hash_only_args.items() if value is not None]
+        if given:
+            parser.error("{} can only be used with --sharding hash".format(", ".join(given)))
+    if args.max_shard_bytes is not None and args.max_shard_bytes <= 0:
+        parser.error("--max-shard-bytes must be positive")
+    if args.max_shard_lines is not None and args.max_shard_lines <= 0:
+        parser.error("--max-shard-lines must be positive")
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.block_size <= 0:
+        parser.error("--block-size must be positive")
+    if args.read_ahead <= 0:
+        parser.error("--read-ahead must be positive")
+    if args.simulate_latency_ms < 0:
+        parser.error("--simulate-latency-ms must not be negative")
+
+    # Pipeline steps
+    opener = ThrottledOpener(args.simulate_latency_ms / 1000) if args.simulate_latency_ms else None
+    tokenize_directory(block_size=args.block_size, read_ahead=args.read_ahead, opener=opener,
+                       bytes_fast_path=args.bytes_fast_path)
+    if args.sharding == "hash":
+        if args.max_shard_bytes is None and args.max_shard_lines is None:
+            args.max_shard_bytes = 64 * 1024 * 1024
+        write_to_hashed_shards(max_bytes=args.max_shard_bytes, max_lines=args.max_shard_lines,
+                               splits=args.splits, workers=args.workers or 4)
+    else:
+        write_to_shards()
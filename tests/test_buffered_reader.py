@@ -0,0 +1,104 @@
+import random
+
+import pytest
+
+from buffered_reader import ReadAheadReader, ThrottledOpener
+
+
+def write_file(tmp_path, data):
+    path = tmp_path / "source.txt"
+    path.write_bytes(data)
+    return str(path)
+
+
+def read_lines(path, block_size, decode=True, **kwargs):
+    with ReadAheadReader(path, block_size, read_ahead=1, decode=decode, **kwargs) as reader:
+        return [line for lines in reader for line in lines]
+
+
+def expected_lines(path):
+    with open(path, encoding="utf-8") as file:
+        return list(file)
+
+
+def assert_matches_open(path, block_size):
+    expected = expected_lines(path)
+    assert read_lines(path, block_size) == expected
+    assert [line.decode("utf-8") for line in read_lines(path, block_size, decode=False)] == expected
+
+
+def test_multi_byte_char_split_across_blocks(tmp_path):
+    # 'අ' is encoded as 3 bytes, a block size of 2 splits it in two
+    path = write_file(tmp_path, "xඅ\nඅය\n".encode("utf-8"))
+    for block_size in range(1, 5):
+        assert_matches_open(path, block_size)
+
+
+def test_crlf_split_across_blocks(tmp_path):
+    path = write_file(tmp_path, b"a\r\nb\r\n")
+    assert read_lines(path, 2) == ["a\n", "b\n"]
+    assert read_lines(path, 2, decode=False) == [b"a\n", b"b\n"]
+    assert_matches_open(path, 2)
+
+
+def test_bare_cr_at_end_of_file(tmp_path):
+    path = write_file(tmp_path, b"a\rb\r")
+    assert read_lines(path, 3) == ["a\n", "b\n"]
+    assert read_lines(path, 3, decode=False) == [b"a\n", b"b\n"]
+
+
+def test_last_line_without_newline(tmp_path):
+    path = write_file(tmp_path, "ක\nඛ".encode("utf-8"))
+    assert read_lines(path, 2) == ["ක\n", "ඛ"]
+    assert read_lines(path, 2, decode=False) == ["ක\n".encode("utf-8"), "ඛ".encode("utf-8")]
+
+
+def test_empty_file(tmp_path):
+    path = write_file(tmp_path, b"")
+    assert read_lines(path, 4) == []
+    assert read_lines(path, 4, decode=False) == []
+
+
+def test_random_files_match_open(tmp_path):
+    rng = random.Random(3)
+    alphabet = ["a", " ", "\n", "\r", "\r\n", "ක", "ඛ", "•", "\x85"]
+    for _ in range(200):
+        path = write_file(tmp_path, "".join(rng.choice(alphabet) for _ in range(30)).encode("utf-8"))
+        assert_matches_open(path, rng.randint(1, 7))
+
+
+def test_opener_error_reaches_consumer(tmp_path):
+    def failing_opener(path):
+        raise OSError("mount is gone")
+
+    with pytest.raises(OSError, match="mount is gone"):
+        read_lines(str(tmp_path / "source.txt"), 4, opener=failing_opener)
+
+
+def test_missing_file_error_reaches_consumer(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        read_lines(str(tmp_path / "missing.txt"), 4)
+
+
+def test_close_after_breaking_out_early(tmp_path):
+    path = write_file(tmp_path, b"line\n" * 10000)
+    reader = ReadAheadReader(path, block_size=8, read_ahead=1)
+    for lines in reader:
+        assert lines == ["line\n"]
+        break
+    reader.close()
+    assert not reader._thread.is_alive()
+
+
+def test_throttled_opener(tmp_path):
+    path = write_file(tmp_path, "ක ඛ\r\nග\n".encode("utf-8") * 5)
+    opener = ThrottledOpener(latency=0.001)
+    assert read_lines(path, 4, opener=opener) == expected_lines(path)
+    assert [line.decode("utf-8") for line in read_lines(path, 4, decode=False, opener=opener)] == \
+        expected_lines(path)
+
+
+@pytest.mark.parametrize("block_size, read_ahead", [(0, 1), (1, 0), (-1, 4)])
+def test_invalid_arguments(tmp_path, block_size, read_ahead):
+    with pytest.raises(ValueError):
+        ReadAheadReader(str(tmp_path / "source.txt"), block_size, read_ahead)
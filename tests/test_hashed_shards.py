@@ -0,0 +1,134 @@
+import glob
+import os
+import subprocess
+import sys
+
+import pytest
+
+import pipeline
+
+REPO_DIRECTORY = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+
+SPLITS = {"train": 0.8, "validation": 0.1, "test": 0.1}
+
+
+def sentences(count=2000):
+    return ["වාක්‍ය අංක {} ක ඛ ග\n".format(i) for i in range(count)]
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    os.makedirs(tmp_path / "datasets" / "temp")
+    os.makedirs(tmp_path / "datasets" / "tokenized")
+    with open(tmp_path / "datasets" / "temp" / "temp.txt", "w", encoding="utf-8") as temp_file:
+        temp_file.writelines(sentences())
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def read_shards(directory):
+    shards = {}
+    for shard_file in sorted(glob.glob(os.path.join(directory, "datasets", "tokenized", "**", "*.txt"),
+                                       recursive=True)):
+        with open(shard_file, "rb") as file:
+            shards[os.path.relpath(shard_file, directory)] = file.read()
+    return shards
+
+
+def test_stable_hash_is_fixed():
+    assert pipeline.stable_hash("ක ඛ ග\n") == pipeline.stable_hash("ක ඛ ග\n")
+    shard_key, split_point = pipeline.stable_hash("ක ඛ ග\n")
+    assert 0 <= shard_key < 2 ** 64
+    assert 0 <= split_point < 1
+
+
+def test_runs_are_byte_identical(workspace):
+    pipeline.write_to_hashed_shards(max_lines=100, splits=SPLITS, workers=3)
+    first = read_shards(workspace)
+    pipeline.write_to_hashed_shards(max_lines=100, splits=SPLITS, workers=1)
+    assert read_shards(workspace) == first
+    assert len(first) > 3
+
+
+def test_runs_are_byte_identical_across_hash_seeds(workspace):
+    results = []
+    for seed in ["1", "2"]:
+        env = dict(os.environ, PYTHONHASHSEED=seed, PYTHONPATH=REPO_DIRECTORY)
+        subprocess.run([sys.executable, "-c",
+                        "import pipeline; pipeline.write_to_hashed_shards(max_bytes=4000, splits="
+                        + repr(SPLITS) + ")"], cwd=str(workspace), env=env, check=True)
+        results.append(read_shards(workspace))
+    assert results[0] == results[1]
+    assert len(results[0]) > 3
+
+
+def test_caps_are_honoured():
+    lines = [(pipeline.stable_hash(line)[0], line) for line in sentences()]
+    for max_bytes, max_lines in [(1000, None), (None, 30), (700, 10)]:
+        shards = pipeline.partition_shards(lines, max_bytes, max_lines)
+        parts = [part for parts in shards for part in parts]
+        assert sorted(line for part in parts for line in part) == sorted(line for _, line in lines)
+        for part in parts:
+            if max_bytes is not None:
+                assert sum(len(line.encode("utf-8")) for line in part) <= max_bytes
+            if max_lines is not None:
+                assert len(part) <= max_lines
+
+
+def test_oversized_sentence_gets_a_part_of_its_own():
+    long_line = "ක" * 500 + "\n"
+    lines = [(pipeline.stable_hash(line)[0], line) for line in sentences(50) + [long_line]]
+    shards = pipeline.partition_shards(lines, max_bytes=200)
+    assert [long_line] in [part for parts in shards for part in parts]
+
+
+def test_shard_placement_is_hash_modulo_shard_count():
+    lines = [(pipeline.stable_hash(line)[0], line) for line in sentences()]
+    shards = pipeline.partition_shards(lines, max_lines=100)
+    for index, parts in enumerate(shards):
+        for part in parts:
+            for line in part:
+                assert pipeline.stable_hash(line)[0] % len(shards) == index
+
+
+def test_split_ratios_are_roughly_honoured():
+    counts = dict.fromkeys(SPLITS, 0)
+    for line in sentences(10000):
+        split = pipeline.pick_split(pipeline.stable_hash(line)[1], SPLITS)
+        assert split == pipeline.pick_split(pipeline.stable_hash(line)[1], SPLITS)
+        counts[split] += 1
+    for split, ratio in SPLITS.items():
+        assert abs(counts[split] / 10000 - ratio) < 0.02
+
+
+def test_sentences_keep_their_split(workspace):
+    pipeline.write_to_hashed_shards(max_lines=100, splits=SPLITS)
+    for split in SPLITS:
+        for shard_file in glob.glob(os.path.join("datasets", "tokenized", split, "*.txt")):
+            with open(shard_file, encoding="utf-8", newline="\n") as file:
+                for line in file:
+                    assert pipeline.pick_split(pipeline.stable_hash(line)[1], SPLITS) == split
+
+
+def test_remove_shards_deletes_stale_shards(workspace):
+    pipeline.write_to_hashed_shards(max_lines=50, splits=SPLITS)
+    with open(os.path.join("datasets", "tokenized", "tokenized_shard_100000.txt"), "w") as file:
+        file.write("stale\n")
+    with open(os.path.join("datasets", "tokenized", "notes.txt"), "w") as file:
+        file.write("kept\n")
+    pipeline.remove_shards(os.path.join("datasets", "tokenized"))
+    assert os.listdir(os.path.join("datasets", "tokenized")) == ["notes.txt"]
+
+
+def test_rerun_with_larger_cap_leaves_no_stale_shards(workspace):
+    pipeline.write_to_hashed_shards(max_bytes=500, splits=SPLITS)
+    pipeline.write_to_hashed_shards(max_bytes=10 ** 6, splits=SPLITS)
+    assert sorted(read_shards(workspace)) == [
+        os.path.join("datasets", "tokenized", split, "tokenized_shard_00000_000.txt")
+        for split in sorted(SPLITS)]
+
+
+def test_legacy_sharding_removes_hashed_shards(workspace):
+    pipeline.write_to_hashed_shards(max_lines=100, splits=SPLITS)
+    pipeline.write_to_shards()
+    assert sorted(os.listdir(os.path.join("datasets", "tokenized"))) == ["tokenized_shard_100000.txt"]
@@ -0,0 +1,73 @@
+import glob
+import os
+import random
+
+import pytest
+
+import pipeline
+from tokenizer import SinhalaTokenizer
+
+RAW_DIRECTORY = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, "datasets", "raw"))
+
+
+def corpus_lines():
+    lines = []
+    for source_file in sorted(glob.glob(os.path.join(RAW_DIRECTORY, "*.txt"))):
+        with open(source_file, encoding="utf-8") as file:
+            lines.extend(file)
+    return lines
+
+
+def random_documents(tokenizer, count=20000, seed=17):
+    corpus = "".join(corpus_lines())
+    alphabet = sorted(set(corpus))
+    alphabet += [c for c in tokenizer.ignoring_chars if c]
+    alphabet += tokenizer.invalid_chars + tokenizer.short_forms + tokenizer.line_tokenizing_chars
+    alphabet += ['<', '¼', '<¼', '(', ')', '(ක)', '.', ' ', '\n', '\r', '\x85', ' ',
+                 tokenizer.short_form_identifier]
+    rng = random.Random(seed)
+    return ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 60))) for _ in range(count)]
+
+
+@pytest.fixture(scope="module")
+def tokenizer():
+    return SinhalaTokenizer()
+
+
+def test_corpus_has_lines():
+    assert len(corpus_lines()) > 0
+
+
+@pytest.mark.parametrize("return_sinhala_only", [False, True])
+def test_corpus_lines_match_str_tokenizer(tokenizer, return_sinhala_only):
+    for line in corpus_lines():
+        assert tokenizer.split_sentences_bytes(line.encode("utf-8"), return_sinhala_only) == \
+            tokenizer.split_sentences(line, return_sinhala_only), line
+
+
+@pytest.mark.parametrize("return_sinhala_only", [False, True])
+def test_random_documents_match_str_tokenizer(tokenizer, return_sinhala_only):
+    for doc in random_documents(tokenizer):
+        assert tokenizer.split_sentences_bytes(doc.encode("utf-8"), return_sinhala_only) == \
+            tokenizer.split_sentences(doc, return_sinhala_only), repr(doc)
+
+
+@pytest.mark.parametrize("return_sinhala_only", [False, True])
+def test_isolated_punctuations_match_str_tokenizer(return_sinhala_only):
+    tokenizer = SinhalaTokenizer()
+    tokenizer.isolate_punctuations_with_spaces = True
+    for doc in corpus_lines() + random_documents(tokenizer, count=2000):
+        assert tokenizer.split_sentences_bytes(doc.encode("utf-8"), return_sinhala_only) == \
+            tokenizer.split_sentences(doc, return_sinhala_only), repr(doc)
+
+
+@pytest.mark.parametrize("block_size", [5, 1024 * 1024])
+def test_tokenize_directory_matches_str_tokenizer(tmp_path, monkeypatch, block_size):
+    monkeypatch.chdir(tmp_path)
+    outputs = []
+    for bytes_fast_path in [False, True]:
+        pipeline.tokenize_directory(RAW_DIRECTORY, block_size=block_size, bytes_fast_path=bytes_fast_path)
+        with open(os.path.join("datasets", "temp", "temp.txt"), "rb") as temp_file:
+            outputs.append(temp_file.read())
+    assert len(outputs[0]) > 0
+    assert outputs[0] == outputs[1]
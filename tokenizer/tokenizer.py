@@ -20,6 +20,47 @@ def is_a_sinhala_letter(s: Text) -> Boolean:
     return False
 
 
+# UTF-8 encoding of the Sinhala block (U+0D80 - U+0DFF) starts with one of these
+SINHALA_UTF8_PREFIXES = (b'\xe0\xb6', b'\xe0\xb7')
+
+# continuation bytes of UTF-8, deleting them leaves one byte per character
+UTF8_CONTINUATION_BYTES = bytes(range(0x80, 0xc0))
+
+PARENTHESIS_TEXT_BYTES = re.compile(br'\([^()]+\)')
+
+
+def bytes_trie_pattern(words: List[bytes]) -> bytes:
+    """
+    Builds a regex matching any of the non empty `words`, nested by common
+    prefix so that the regex engine does not try every alternative at every
+    position. Eg: [b'ab', b'ac', b'x'] -> b'(?:a[bc]|x)'
+    """
+    if all(len(w) == 1 for w in words):
+        if len(set(words)) == 1:
+            return re.escape(words[0])
+        return b'[' + b''.join(re.escape(w) for w in sorted(set(words))) + b']'
+    branches = []
+    for first in sorted(set(w[0] for w in words)):
+        prefix = re.escape(bytes([first]))
+        suffixes = [w[1:] for w in words if w[0] == first]
+        rest = [w for w in suffixes if w]
+        if not rest:
+            branches.append(prefix)
+        elif len(rest) == len(suffixes):
+            branches.append(prefix + bytes_trie_pattern(rest))
+        else:
+            branches.append(prefix + b'(?:' + bytes_trie_pattern(rest) + b')?')
+    return branches[0] if len(branches) == 1 else b'(?:' + b'|'.join(branches) + b')'
+
+
+def contains_sinhala_bytes(s: bytes) -> Boolean:
+    return SINHALA_UTF8_PREFIXES[0] in s or SINHALA_UTF8_PREFIXES[1] in s
+
+
+def utf8_length(s: bytes) -> int:
+    return len(s.translate(None, UTF8_CONTINUATION_BYTES))
+
+
 def contains_sinhala(s: Text) -> Boolean:
     for c in s:
         if is_a_sinhala_letter(c):
@@ -99,6 +140,33 @@ class SinhalaTokenizer(Tokenizer):
         # init line tokenizer
         self.line_tokenizer_delims = '[{}]'.format(re.escape(''.join(self.line_tokenizing_chars)))
 
+        # init bytes fast path for `split_sentences_bytes`
+        # ignoring chars are removed in stages so that multi char entries (Eg: '<¼') are
+        # removed at the same point of the sequence as in `split_sentences`
+        # each stage is a table of ascii bytes to delete and a pattern for the rest
+        self.ignoring_chars_bytes_stages = []
+        single_chars = []
+        for ignoring_char in self.ignoring_chars + [None]:
+            if ignoring_char == '':
+                continue
+            if ignoring_char is not None and len(ignoring_char) == 1:
+                single_chars.append(ignoring_char.encode('utf-8'))
+                continue
+            if single_chars:
+                ascii_chars = b''.join(c for c in single_chars if len(c) == 1)
+                other_chars = [c for c in single_chars if len(c) != 1]
+                self.ignoring_chars_bytes_stages.append(
+                    (ascii_chars, re.compile(bytes_trie_pattern(other_chars)) if other_chars else None))
+                single_chars = []
+            if ignoring_char is not None:
+                self.ignoring_chars_bytes_stages.append((b'', re.compile(re.escape(ignoring_char.encode('utf-8')))))
+        # a short form is replaced by swapping its trailing '.' only, hence it is enough
+        # to check the text before every '.' against the short forms without their '.'
+        self.short_forms_bytes = tuple(short_form[0:-1].encode('utf-8') for short_form in self.short_forms)
+        self.short_form_identifier_bytes = self.short_form_identifier.encode('utf-8')
+        self.line_tokenizer_delims_bytes = re.compile(b'|'.join(
+            re.escape(c.encode('utf-8')) for c in self.line_tokenizing_chars))
+
     def tokenize(self, sentence: Text) -> List[Text]:
         # remove ignoring chars from document
         for ignoring_char in self.ignoring_chars:
@@ -163,3 +231,57 @@ class SinhalaTokenizer(Tokenizer):
             elif not return_sinhala_only and len(sentence) != 0:
                 sentences.append(sentence)
         return sentences
+
+    def split_sentences_bytes(self, doc: bytes, return_sinhala_only: Boolean = False) -> List[Text]:
+        """
+        Same as `split_sentences`, but works on a UTF-8 encoded document and
+        only decodes the sentences which are returned.
+        """
+        # remove ignoring chars from document
+        for ascii_chars, other_chars in self.ignoring_chars_bytes_stages:
+            if ascii_chars:
+                doc = doc.translate(None, ascii_chars)
+            if other_chars is not None and not doc.isascii():
+                doc = other_chars.sub(b'', doc)
+
+        # stop words being present with a punctuation at start or end of the word
+        # Eg: word?     word,
+        if self.isolate_punctuations_with_spaces:  # default is set to FALSE
+            for punctuation in self.punctuations_without_line_tokenizing_chars:
+                punctuation = punctuation.encode('utf-8')
+                doc = doc.replace(punctuation, b' ' + punctuation + b' ')
+
+        # prevent short forms being splitted into sentences
+        # Eg: පෙ.ව.
+        if b'.' in doc:
+            parts = doc.split(b'.')
+            pieces = []
+            for part in parts[:-1]:
+                pieces.append(part)
+                pieces.append(self.short_form_identifier_bytes if part.endswith(self.short_forms_bytes) else b'.')
+            pieces.append(parts[-1])
+            doc = b''.join(pieces)
+
+        #remove text between parenthesis.
+        if b'(' in doc:
+            parenthesis_text = PARENTHESIS_TEXT_BYTES.findall(doc)
+            for text in parenthesis_text:
+                if utf8_length(text) < 40:
+                    doc = PARENTHESIS_TEXT_BYTES.sub(b'', doc)
+
+        sentences = []
+        # split lines
+        parts = self.line_tokenizer_delims_bytes.split(doc)
+
+        for sentence in parts:
+            sentence = sentence.replace(self.short_form_identifier_bytes, b'.')
+            if contains_sinhala_bytes(sentence):  # filter empty sentences and non-sinhala sentences
+                sentences.append(sentence.decode('utf-8').strip())
+            elif not return_sinhala_only:
+                # ascii whitespace only sentences are empty, skip decoding them
+                sentence = sentence.strip()
+                if len(sentence) != 0:
+                    sentence = sentence.decode('utf-8').strip()
+                    if len(sentence) != 0:
+                        sentences.append(sentence)
+        return sentences